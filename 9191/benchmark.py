@@ -0,0 +1,338 @@
+"""benchmark.py: Benchmarks com dados sintéticos para as tarefas de 9191
+
+Para cada tarefa são gerados dados reprodutíveis (semente fixa) em vários
+tamanhos e são medidos os tempos de carregamento, inserção, consulta,
+agregação e gravação. O resultado é um JSON com os tempos de cada medição
+e, por caso/operação, o expoente de escalonamento (declive de log(tempo)
+em função de log(tamanho)): ~1 é linear, ~2 é quadrático.
+
+Uso: python benchmark.py [-t 1000 2000 4000] [-r 3] [-s 0] [-o resultados.json]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from math import log
+from operator import attrgetter
+from random import Random
+from statistics import mean
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from tarefa4.turma import (
+    DISCIPLINAS,
+    Aluno,
+    EstatisticasTurma,
+    Turma,
+    TurmaCompacta,
+    importar_alunos,
+)
+from tarefa6.grupo_desportivo import (
+    Avaliacao,
+    Desportista,
+    GrupoDesportivo,
+    ler_avaliacoes,
+    ler_desportistas,
+)
+from tarefa7.gestao_stock import GestorStock, Preco, Produto, ler_precos, ler_produtos
+
+# o gerador do plantel é partilhado com tarefa5/benchmark_plantel.py, que
+# importa gestor_plantel como módulo de topo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tarefa5"))
+from benchmark_plantel import gerar_plantel  # noqa: E402
+from gestor_plantel import Plantel  # noqa: E402
+
+TAMANHOS = [1000, 2000, 4000, 8000]
+
+
+@dataclass
+class Medicao:
+    """Representação de uma medição"""
+
+    caso: str
+    operacao: str
+    tamanho: int
+    segundos: float
+
+
+def cronometrar(preparar: Callable, f: Callable, repeticoes: int) -> float:
+    """Retorna o melhor tempo de f(preparar()), excluindo a preparação"""
+    tempos = []
+    for _ in range(repeticoes):
+        estado = preparar()
+        inicio = perf_counter()
+        f(estado)
+        tempos.append(perf_counter() - inicio)
+    return min(tempos)
+
+
+# Geradores de dados
+def gerar_produtos_precos(n: int, semente: int):
+    """Gera n preços distribuídos por n/10 produtos"""
+    aleatorio = Random(semente)
+    produtos = [Produto(i, f"produto {i}") for i in range(1, n // 10 + 2)]
+    precos = [
+        Preco(
+            i, aleatorio.randint(1, len(produtos)), round(aleatorio.uniform(0, 100), 2)
+        )
+        for i in range(1, n + 1)
+    ]
+    return produtos, precos
+
+
+def gerar_desportistas_avaliacoes(n: int, semente: int):
+    """Gera n avaliações distribuídas por n/10 desportistas"""
+    aleatorio = Random(semente)
+    desportistas = [Desportista(i, f"desportista {i}") for i in range(1, n // 10 + 2)]
+    avaliacoes = [
+        Avaliacao(
+            i,
+            aleatorio.randint(1, len(desportistas)),
+            round(aleatorio.uniform(0, 20), 1),
+        )
+        for i in range(1, n + 1)
+    ]
+    return desportistas, avaliacoes
+
+
+def gerar_turma(n: int, semente: int) -> Turma:
+    """Gera uma turma com n alunos"""
+    aleatorio = Random(semente)
+    alunos = [
+        Aluno(i, {disciplina: aleatorio.randint(0, 20) for disciplina in DISCIPLINAS})
+        for i in range(1, n + 1)
+    ]
+    return Turma(alunos=alunos, disciplinas=DISCIPLINAS)
+
+
+def turma_para_csv(turma: Turma) -> str:
+    """Serializa uma turma no formato aceite por importar_alunos"""
+    linhas = [",".join(DISCIPLINAS)]
+    linhas.extend(
+        ",".join(str(aluno.nota(d)) for d in DISCIPLINAS) for aluno in turma.alunos
+    )
+    return "\n".join(linhas) + "\n"
+
+
+# Casos
+def caso_stock(n: int, semente: int, pasta: str) -> Dict[str, tuple]:
+    """Operações de gestao_stock"""
+    produtos, precos = gerar_produtos_precos(n, semente)
+    ficheiro_produtos = os.path.join(pasta, "produtos.csv")
+    ficheiro_precos = os.path.join(pasta, "precos.csv")
+    GestorStock(produtos, precos).salvar(ficheiro_produtos, ficheiro_precos)
+
+    def gestor():
+        return GestorStock(list(produtos), list(precos))
+
+    def inserir(g: GestorStock):
+        for preco in precos:
+            g.adicionar_preco(preco.produto_id, preco.valor)
+
+    def consultar(g: GestorStock):
+        for produto in g.produtos:
+            g.precos_de_produto(produto)
+
+    def agregar(g: GestorStock):
+        for produto in g.produtos:
+            valores = list(map(attrgetter("valor"), g.precos_de_produto(produto)))
+            if valores:
+                mean(valores)
+
+    return {
+        "carregar": (
+            lambda: None,
+            lambda _: (ler_produtos(ficheiro_produtos), ler_precos(ficheiro_precos)),
+        ),
+        "inserir": (lambda: GestorStock(list(produtos), []), inserir),
+        "consultar": (gestor, consultar),
+        "agregar": (gestor, agregar),
+        "salvar": (gestor, lambda g: g.salvar(ficheiro_produtos, ficheiro_precos)),
+    }
+
+
+def caso_grupo(n: int, semente: int, pasta: str) -> Dict[str, tuple]:
+    """Operações de grupo_desportivo"""
+    desportistas, avaliacoes = gerar_desportistas_avaliacoes(n, semente)
+    ficheiro_desportistas = os.path.join(pasta, "desportistas.csv")
+    ficheiro_avaliacoes = os.path.join(pasta, "avaliacoes.csv")
+    GrupoDesportivo(desportistas, avaliacoes).salvar(
+        ficheiro_desportistas, ficheiro_avaliacoes
+    )
+
+    def grupo():
+        return GrupoDesportivo(list(desportistas), list(avaliacoes))
+
+    def inserir(g: GrupoDesportivo):
+        for avaliacao in avaliacoes:
+            g.adicionar_avaliacao(avaliacao.desportista_id, avaliacao.valor)
+
+    def consultar(g: GrupoDesportivo):
+        for desportista in g.desportistas:
+            g.avaliacoes_de_desportista(desportista)
+
+    def agregar(g: GrupoDesportivo):
+        for desportista in g.desportistas:
+            valores = [a.valor for a in g.avaliacoes_de_desportista(desportista)]
+            if valores:
+                mean(valores)
+
+    return {
+        "carregar": (
+            lambda: None,
+            lambda _: (
+                ler_desportistas(ficheiro_desportistas),
+                ler_avaliacoes(ficheiro_avaliacoes),
+            ),
+        ),
+        "inserir": (lambda: GrupoDesportivo(list(desportistas), []), inserir),
+        "consultar": (grupo, consultar),
+        "agregar": (grupo, agregar),
+        "salvar": (
+            grupo,
+            lambda g: g.salvar(ficheiro_desportistas, ficheiro_avaliacoes),
+        ),
+    }
+
+
+def caso_plantel(n: int, semente: int, _: str) -> Dict[str, tuple]:
+    """Operações de gestor_plantel (sem persistência, logo sem gravação)"""
+    gerado = gerar_plantel(n, semente, n_jogadores=n // 10 + 1)
+    jogadores, medidas = gerado.jogadores, gerado.medidas
+
+    def plantel():
+        return Plantel(list(jogadores), list(medidas))
+
+    def inserir(p: Plantel):
+        for medida in medidas:
+            p.adicionar_medida(medida)
+
+    def consultar(p: Plantel):
+        for jogador in p.jogadores:
+            p.jogador_por_id(jogador.id)
+
+    return {
+        "carregar": (lambda: None, lambda _: plantel()),
+        "inserir": (lambda: Plantel(list(jogadores), []), inserir),
+        "consultar": (plantel, consultar),
+        "agregar": (plantel, lambda p: p.estatisticas_plantel()),
+    }
+
+
+def caso_turma(n: int, semente: int, _: str) -> Dict[str, tuple]:
+    """Operações de turma, com Turma e TurmaCompacta (sem gravação em turma.py)"""
+    turma = gerar_turma(n, semente)
+    texto = turma_para_csv(turma)
+    compacta = TurmaCompacta.de_turma(turma)
+
+    def relatorios(t):
+        t.medias_por_disciplina()
+        t.medias_dos_alunos()
+        t.melhor_nota_por_disciplina()
+        t.pior_nota_por_disciplina()
+
+    def inserir(t: TurmaCompacta):
+        for aluno in turma.alunos:
+            t.adicionar_aluno(aluno)
+
+    def consultar(t: Turma):
+        for disciplina in DISCIPLINAS:
+            list(t.notas_de(disciplina))
+
+    return {
+        "carregar": (
+            lambda: io.StringIO(texto),
+            lambda f: importar_alunos(f, DISCIPLINAS),
+        ),
+        "inserir": (lambda: TurmaCompacta(disciplinas=DISCIPLINAS), inserir),
+        "consultar": (lambda: turma, consultar),
+        "agregar": (lambda: turma, relatorios),
+        "agregar_compacta": (lambda: compacta, relatorios),
+        "agregar_histograma": (lambda: compacta, EstatisticasTurma.de_turma),
+    }
+
+
+CASOS: Dict[str, Callable] = {
+    "stock": caso_stock,
+    "grupo": caso_grupo,
+    "plantel": caso_plantel,
+    "turma": caso_turma,
+}
+
+
+def expoente_escalonamento(medicoes: List[Medicao]) -> float:
+    """Declive, por mínimos quadrados, de log(segundos) em função de log(tamanho)"""
+    pontos = [(log(m.tamanho), log(m.segundos)) for m in medicoes if m.segundos > 0]
+    if len(pontos) < 2:
+        return None
+    media_x = mean(x for x, _ in pontos)
+    media_y = mean(y for _, y in pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    covariancia = sum((x - media_x) * (y - media_y) for x, y in pontos)
+    return covariancia / variancia if variancia else None
+
+
+def executar(
+    casos: List[str], tamanhos: List[int], repeticoes: int, semente: int
+) -> List[Medicao]:
+    """Executa os casos pedidos em todos os tamanhos"""
+    medicoes = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome in casos:
+            for tamanho in tamanhos:
+                operacoes = CASOS[nome](tamanho, semente, pasta)
+                for operacao, (preparar, f) in operacoes.items():
+                    segundos = cronometrar(preparar, f, repeticoes)
+                    medicoes.append(Medicao(nome, operacao, tamanho, segundos))
+                    print(
+                        f"{nome:>8} {operacao:>18} {tamanho:>8} {segundos:>10.4f}s",
+                        file=sys.stderr,
+                    )
+    return medicoes
+
+
+def relatorio(medicoes: List[Medicao], semente: int) -> dict:
+    """Relatório em formato serializável para JSON"""
+    series: Dict[str, List[Medicao]] = {}
+    for medicao in medicoes:
+        series.setdefault(f"{medicao.caso}.{medicao.operacao}", []).append(medicao)
+    return {
+        "semente": semente,
+        "python": sys.version.split()[0],
+        "medicoes": [vars(medicao) for medicao in medicoes],
+        "escalonamento": {
+            chave: {
+                "tamanhos": [m.tamanho for m in serie],
+                "segundos": [m.segundos for m in serie],
+                "expoente": expoente_escalonamento(serie),
+            }
+            for chave, serie in series.items()
+        },
+    }
+
+
+def main():
+    """Função de entrada"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-t", "--tamanhos", type=int, nargs="+", default=TAMANHOS)
+    parser.add_argument("-r", "--repeticoes", type=int, default=3)
+    parser.add_argument("-s", "--semente", type=int, default=0)
+    parser.add_argument("-c", "--casos", nargs="+", choices=CASOS, default=list(CASOS))
+    parser.add_argument("-o", "--saida", help="ficheiro JSON (por omissão, stdout)")
+    args = parser.parse_args()
+
+    medicoes = executar(args.casos, args.tamanhos, args.repeticoes, args.semente)
+    resultado = json.dumps(relatorio(medicoes, args.semente), indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            saida.write(resultado + "\n")
+    else:
+        print(resultado)
+
+
+if __name__ == "__main__":
+    main()
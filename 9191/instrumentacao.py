@@ -0,0 +1,128 @@
+"""instrumentacao.py: Contagens, latências e perfis das sessões dos gestores
+
+Partilhado por tarefa6/grupo_desportivo.py e tarefa7/gestao_stock.py.
+"""
+
+import cProfile
+import logging
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from time import perf_counter
+from typing import List, Dict, Callable
+
+# Limites superiores, em ms, das classes do histograma de latências
+LIMITES_LATENCIA_MS = [0.1, 1, 10, 100, 1000]
+
+
+@dataclass
+class EstatisticaChamadas:
+    """Contagem de chamadas e histograma de latências de uma função"""
+
+    chamadas: int = 0
+    total: float = 0.0
+    histograma: List[int] = field(
+        default_factory=lambda: [0] * (len(LIMITES_LATENCIA_MS) + 1)
+    )
+
+    def registar(self, segundos: float):
+        """Regista uma chamada com uma dada duração"""
+        self.chamadas += 1
+        self.total += segundos
+        self.histograma[bisect_left(LIMITES_LATENCIA_MS, segundos * 1000)] += 1
+
+
+class Instrumentacao:
+    """Registo das chamadas instrumentadas de um gestor
+
+    O tempo passado à espera do utilizador em entrada() é descontado da
+    função instrumentada em curso, pelo que as latências medem só trabalho.
+    """
+
+    def __init__(self, nome: str):
+        self.log = logging.getLogger(nome)
+        self.estatisticas: Dict[str, EstatisticaChamadas] = {}
+        self.espera = 0.0
+
+    def entrada(self, prompt: str = "") -> str:
+        """input() cujo tempo de espera não conta para as latências"""
+        inicio = perf_counter()
+        try:
+            return input(prompt)
+        finally:
+            self.espera += perf_counter() - inicio
+
+    def instrumentar(self, nome: str, contar_linhas: Callable = None) -> Callable:
+        """Decorador que regista a latência de cada chamada
+
+        Com contar_linhas(args, resultado), a duração e o número de linhas
+        também são registados no log.
+        """
+
+        def decorador(f: Callable) -> Callable:
+            @wraps(f)
+            def instrumentada(*args, **kwargs):
+                espera_inicial = self.espera
+                inicio = perf_counter()
+                try:
+                    resultado = f(*args, **kwargs)
+                finally:
+                    # chamadas que levantam exceções também contam
+                    duracao = perf_counter() - inicio - (self.espera - espera_inicial)
+                    self.estatisticas.setdefault(
+                        nome, EstatisticaChamadas()
+                    ).registar(duracao)
+                if contar_linhas is not None:
+                    linhas = contar_linhas(args, resultado)
+                    self.log.info("%s: %d linhas em %.3f s", nome, linhas, duracao)
+                return resultado
+
+            return instrumentada
+
+        return decorador
+
+    def imprimir(self):
+        """Imprime chamadas e latências de cada função instrumentada"""
+        classes = [f"<{limite:g}ms" for limite in LIMITES_LATENCIA_MS]
+        classes.append(f">={LIMITES_LATENCIA_MS[-1]:g}ms")
+        print("Estatísticas:")
+        for nome, estatistica in self.estatisticas.items():
+            media_ms = estatistica.total / estatistica.chamadas * 1000
+            print(
+                f"- {nome}: {estatistica.chamadas} chamada(s),"
+                + f" média {media_ms:.3f} ms, total {estatistica.total * 1000:.3f} ms"
+            )
+            print(
+                "  "
+                + " | ".join(
+                    f"{classe}: {n}"
+                    for classe, n in zip(classes, estatistica.histograma)
+                )
+            )
+
+    def executar_sessao(self, sessao: Callable):
+        """Executa uma sessão; com --perfil corre sob cProfile e grava um dump"""
+        logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+        if "--perfil" not in sys.argv[1:]:
+            sessao()
+            return
+
+        ficheiro = f"sessao-{datetime.now():%Y%m%d-%H%M%S}.pstats"
+        perfil = cProfile.Profile()
+        try:
+            perfil.runcall(sessao)
+        finally:
+            perfil.dump_stats(ficheiro)
+            self.log.info("perfil da sessão gravado em %s", ficheiro)
+
+
+def contar_lidas(_, resultado) -> int:
+    """Número de linhas lidas"""
+    return len(resultado)
+
+
+def contar_escritas(args, _) -> int:
+    """Número de linhas escritas"""
+    return len(args[0])
@@ -0,0 +1,55 @@
+# Autor: Carlos Pinto Machado
+# email: 7791966@formacao.iefp.pt
+
+# Débito de avaliação de expressões com e sem a cache LRU de compilação
+# Uso: python benchmark_expressoes.py [número de avaliações]
+
+import sys
+from random import Random
+from time import perf_counter
+
+from calculadora import compilar_expressao, compilar_expressao_em_cache
+
+FORMULAS = [
+    "x + y * z",
+    "(x - y) ^ 2 / (z + 1)",
+    "2 * x ^ 3 - 4 * x * y + y / (z * z + 1)",
+    "-(x + 1) * (y - 2) * (z + 3) / 7.5 + 0.25 * x * y * z",
+]
+
+
+def gerar_variaveis(n: int, semente: int = 0):
+    aleatorio = Random(semente)
+    return [
+        {nome: aleatorio.uniform(-100, 100) for nome in ("x", "y", "z")}
+        for _ in range(n)
+    ]
+
+
+def debito(compilar, formula: str, ligacoes) -> float:
+    inicio = perf_counter()
+    for variaveis in ligacoes:
+        compilar(formula).avaliar(variaveis)
+    return len(ligacoes) / (perf_counter() - inicio)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ligacoes = gerar_variaveis(n)
+
+    print(f"Avaliações por fórmula: {n}")
+    print(
+        f"{'sem cache (aval/s)':>20} {'com cache (aval/s)':>20} {'ganho':>7}  fórmula"
+    )
+    for formula in FORMULAS:
+        compilar_expressao_em_cache.cache_clear()
+        sem_cache = debito(compilar_expressao, formula, ligacoes)
+        com_cache = debito(compilar_expressao_em_cache, formula, ligacoes)
+        print(
+            f"{sem_cache:>20,.0f} {com_cache:>20,.0f} "
+            f"{com_cache / sem_cache:>6.1f}x  {formula}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
 # Autor: Carlos Pinto Machado
 # email: 7791966@formacao.iefp.pt
 
+import csv
+import math
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Callable, Dict, FrozenSet, Iterator, List, TextIO, Tuple
+
 
 # funções de operações
 def soma(a: float, b: float) -> float:
@@ -24,10 +33,295 @@ OPERACOES = {
     "2": {"nome": "Subtração", "func": subtracao},
     "3": {"nome": "Multiplicação", "func": multiplicacao},
     "4": {"nome": "Divisão", "func": divisao},
-    "5": {"nome": "Sair"},
+    "5": {"nome": "Expressão"},
+    "6": {"nome": "Sair"},
+}
+
+OPERACAO_EXPRESSAO = "5"
+OPERACAO_SAIDA = "6"
+
+
+# Expressões: texto como "2 * (x + y) ^ 2 / z" é analisado por descida
+# recursiva e compilado numa árvore de closures, sem eval. Precedência, da
+# menor para a maior: + -, * /, sinal unário, ^ (associativo à direita).
+# A potência usa math.pow, pelo que o resultado é sempre float: base
+# negativa com expoente fracionário dá ValueError, e não um complexo.
+Variaveis = Dict[str, float]
+No = Callable[[Variaveis], float]
+
+OPERADORES_BINARIOS = {
+    "+": soma,
+    "-": subtracao,
+    "*": multiplicacao,
+    "/": divisao,
+    "^": math.pow,
+}
+
+TOKEN = re.compile(
+    r"\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)"
+    r"|([A-Za-z_]\w*)|(\S))"
+)
+
+TAMANHO_CACHE_EXPRESSOES = 256
+
+# limite de aninhamento (parênteses, sinais e potências), que limita também a
+# profundidade de recursão na avaliação
+PROFUNDIDADE_MAXIMA = 100
+
+
+@dataclass(frozen=True)
+class ExpressaoCompilada:
+    texto: str
+    variaveis: FrozenSet[str]
+    avaliar: No
+
+
+def tokenizar(texto: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for numero, nome, simbolo in TOKEN.findall(texto):
+        if numero:
+            tokens.append(("numero", numero))
+        elif nome:
+            tokens.append(("nome", nome))
+        elif simbolo:
+            tokens.append(("simbolo", simbolo))
+    return tokens
+
+
+def constante(valor: float) -> No:
+    def no(_: Variaveis) -> float:
+        return valor
+
+    no.constante = valor
+    return no
+
+
+def variavel(nome: str) -> No:
+    return lambda variaveis: variaveis[nome]
+
+
+def binario(simbolo: str, esquerda: No, direita: No) -> No:
+    f = OPERADORES_BINARIOS[simbolo]
+    # dobragem de constantes: subárvores sem variáveis avaliam-se já
+    if hasattr(esquerda, "constante") and hasattr(direita, "constante"):
+        try:
+            return constante(f(esquerda.constante, direita.constante))
+        except (ArithmeticError, ValueError):
+            # o erro fica para a avaliação, como nas subárvores com variáveis
+            pass
+    return lambda variaveis: f(esquerda(variaveis), direita(variaveis))
+
+
+def cadeia(primeiro: No, passos: List[Tuple[str, No]]) -> No:
+    # a op b op c ... num só nó n-ário que percorre os operandos num ciclo,
+    # para que cadeias longas de + - * / não aprofundem a árvore
+    if not passos:
+        return primeiro
+    operacoes = [(OPERADORES_BINARIOS[simbolo], no) for simbolo, no in passos]
+
+    def no(variaveis: Variaveis) -> float:
+        valor = primeiro(variaveis)
+        for f, operando in operacoes:
+            valor = f(valor, operando(variaveis))
+        return valor
+
+    return no
+
+
+def simetrico(operando: No) -> No:
+    if hasattr(operando, "constante"):
+        return constante(-operando.constante)
+    return lambda variaveis: -operando(variaveis)
+
+
+class Analisador:
+    def __init__(self, texto: str):
+        self.tokens = tokenizar(texto)
+        self.posicao = 0
+        self.profundidade = 0
+        self.variaveis = set()
+
+    def espreitar(self) -> Tuple[str, str]:
+        if self.posicao < len(self.tokens):
+            return self.tokens[self.posicao]
+        return ("fim", "")
+
+    def consumir(self) -> Tuple[str, str]:
+        token = self.espreitar()
+        self.posicao += 1
+        return token
+
+    def esperar(self, simbolo: str):
+        if self.consumir() != ("simbolo", simbolo):
+            raise ValueError(f"Esperado '{simbolo}'")
+
+    def encadear(self, simbolos: Tuple[str, ...], operando: Callable[[], No]) -> No:
+        operadores = [("simbolo", simbolo) for simbolo in simbolos]
+        no = operando()
+        passos = []
+        while self.espreitar() in operadores:
+            _, simbolo = self.consumir()
+            seguinte = operando()
+            # o prefixo constante da cadeia é dobrado já
+            constantes = hasattr(no, "constante") and hasattr(seguinte, "constante")
+            if not passos and constantes:
+                no = binario(simbolo, no, seguinte)
+            else:
+                passos.append((simbolo, seguinte))
+        return cadeia(no, passos)
+
+    def expressao(self) -> No:
+        return self.encadear(("+", "-"), self.termo)
+
+    def termo(self) -> No:
+        return self.encadear(("*", "/"), self.fator)
+
+    def fator(self) -> No:
+        self.profundidade += 1
+        if self.profundidade > PROFUNDIDADE_MAXIMA:
+            raise ValueError("demasiado aninhada")
+        try:
+            if self.espreitar() == ("simbolo", "-"):
+                self.consumir()
+                return simetrico(self.fator())
+            if self.espreitar() == ("simbolo", "+"):
+                self.consumir()
+                return self.fator()
+            return self.potencia()
+        finally:
+            self.profundidade -= 1
+
+    def potencia(self) -> No:
+        base = self.primario()
+        if self.espreitar() == ("simbolo", "^"):
+            self.consumir()
+            return binario("^", base, self.fator())
+        return base
+
+    def primario(self) -> No:
+        tipo, valor = self.consumir()
+        if tipo == "numero":
+            return constante(float(valor))
+        if tipo == "nome":
+            self.variaveis.add(valor)
+            return variavel(valor)
+        if (tipo, valor) == ("simbolo", "("):
+            no = self.expressao()
+            self.esperar(")")
+            return no
+        raise ValueError(f"Token inesperado '{valor}'" if valor else "Fim inesperado")
+
+
+def compilar_expressao(texto: str) -> ExpressaoCompilada:
+    analisador = Analisador(texto)
+    try:
+        no = analisador.expressao()
+        tipo, valor = analisador.espreitar()
+        if tipo != "fim":
+            raise ValueError(f"Token inesperado '{valor}'")
+    except ValueError as error:
+        raise ValueError(f"Expressão inválida: {error}") from None
+    except RecursionError:
+        raise ValueError("Expressão inválida: demasiado aninhada") from None
+    return ExpressaoCompilada(texto, frozenset(analisador.variaveis), no)
+
+
+# expressões repetidas sobre muitas variáveis não voltam a ser analisadas
+compilar_expressao_em_cache = lru_cache(maxsize=TAMANHO_CACHE_EXPRESSOES)(
+    compilar_expressao
+)
+
+
+def avaliar_expressao(texto: str, variaveis: Variaveis = None) -> float:
+    return compilar_expressao_em_cache(texto).avaliar(variaveis or {})
+
+
+# Modo em lote: cada linha é "operação,a,b", com a operação dada pela chave do
+# menu ou pelo nome da função, e produz um resultado, pela ordem de entrada.
+# Divisões por 0 e linhas inválidas dão NaN nessa linha, sem parar o lote;
+# as linhas inválidas são ainda reportadas com o seu número. Linhas em
+# branco são ignoradas.
+NAN = float("nan")
+
+
+def divisao_mascarada(a: float, b: float) -> float:
+    return a / b if b else NAN
+
+
+OPERACOES_LOTE: Dict[str, Callable[[float, float], float]] = {
+    "soma": soma,
+    "subtracao": subtracao,
+    "multiplicacao": multiplicacao,
+    "divisao": divisao_mascarada,
+}
+
+CHAVES_LOTE: Dict[str, Callable[[float, float], float]] = {
+    **{
+        k: OPERACOES_LOTE[v.get("func").__name__]
+        for (k, v) in OPERACOES.items()
+        if "func" in v
+    },
+    **OPERACOES_LOTE,
 }
 
-OPERACAO_SAIDA = "5"
+TAMANHO_BLOCO = 65536
+
+
+def motivo_linha_invalida(linha: List[str]) -> str:
+    if len(linha) != 3:
+        return "esperado operação,a,b"
+    op, *numeros = linha
+    if op.strip() not in CHAVES_LOTE:
+        return f"operação inválida '{op}'"
+    for numero in numeros:
+        try:
+            float(numero)
+        except ValueError:
+            return f"número inválido '{numero}'"
+    return "linha inválida"
+
+
+def avaliar_lote(
+    entrada: TextIO, ao_erro: Callable[[int, str], None] = None
+) -> Iterator[float]:
+    # sem ao_erro, a primeira linha inválida levanta ValueError
+    leitor = csv.reader(entrada)
+    for linha in leitor:
+        if not linha:
+            continue
+        try:
+            op, a, b = linha
+            resultado = CHAVES_LOTE[op.strip()](float(a), float(b))
+        except (KeyError, ValueError):
+            motivo = motivo_linha_invalida(linha)
+            if ao_erro is None:
+                raise ValueError(f"Linha {leitor.line_num}: {motivo}") from None
+            ao_erro(leitor.line_num, motivo)
+            resultado = NAN
+        yield resultado
+
+
+def main_lote(caminho: str):
+    invalidas = []
+
+    def reportar(numero: int, motivo: str):
+        invalidas.append(numero)
+        print(f"Linha {numero}: {motivo}", file=sys.stderr)
+
+    try:
+        entrada = sys.stdin if caminho == "-" else open(caminho, encoding="utf-8")
+    except OSError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    try:
+        resultados = avaliar_lote(entrada, reportar)
+        while bloco := list(islice(resultados, TAMANHO_BLOCO)):
+            sys.stdout.write("\n".join(map(str, bloco)) + "\n")
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+    if invalidas:
+        sys.exit(1)
 
 
 # Input/Output
@@ -38,6 +332,24 @@ def imprime_menu():
     print("\n".join([f"{k}. {v.get('nome')}" for (k, v) in OPERACOES.items()]))
 
 
+def ler_e_avaliar_expressao():
+    try:
+        expressao = compilar_expressao_em_cache(input("Insira uma expressão: "))
+        variaveis = {
+            nome: float(input(f"Valor de {nome}: "))
+            for nome in sorted(expressao.variaveis)
+        }
+        print(f"Resultado: {expressao.avaliar(variaveis)}")
+    except ValueError as error:
+        print(error)
+    except ZeroDivisionError:
+        print("Não pode dividir por 0")
+    except ArithmeticError as error:
+        print(f"Erro aritmético: {error}")
+    except RecursionError:
+        print("Expressão inválida: demasiado aninhada")
+
+
 def main():
     continua = True
     while continua:
@@ -46,6 +358,8 @@ def main():
 
         if op == OPERACAO_SAIDA:
             continua = False
+        elif op == OPERACAO_EXPRESSAO:
+            ler_e_avaliar_expressao()
         elif op not in OPERACOES:
             print("Operação inválida")
         else:
@@ -59,5 +373,9 @@ def main():
                 print("Não pode dividir por 0")
 
 
+# Uso: python calculadora.py [--lote [ficheiro | -]]
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--lote":
+        main_lote(sys.argv[2] if len(sys.argv) > 2 else "-")
+    else:
+        main()
@@ -1,14 +1,23 @@
 # Autor: Carlos Pinto Machado
 # email: 7791966@formacao.iefp.pt
 
+import csv
 import sys
-from statistics import mean
-from typing import List, Dict, Tuple, Iterator
-from operator import itemgetter
-
-from dataclasses import dataclass
+from array import array
+from collections import Counter
+from fractions import Fraction
+from functools import partial, reduce
+from itertools import accumulate, chain
+from math import ceil
+from statistics import mean, StatisticsError
+from typing import List, Dict, Tuple, Iterable, Iterator, TextIO
+from operator import add, itemgetter, mul
+
+from dataclasses import dataclass, field
 
 DISCIPLINAS = ["Português", "Matemática", "Ciências"]
+NOTA_MAXIMA = 20
+NOTA_APROVACAO = 10
 
 
 @dataclass
@@ -56,6 +65,72 @@ class Turma:
         ]
 
 
+def validar_intervalo(notas: List[int]) -> None:
+    if not all(0 <= nota <= NOTA_MAXIMA for nota in notas):
+        raise ValueError(f"Nota não está entre 0 e {NOTA_MAXIMA}")
+
+
+# Turma em colunas: notas numa matriz alunos x disciplinas de int8 (row-major),
+# cada relatório é calculado com passagens em C sobre as colunas
+@dataclass
+class TurmaCompacta:
+    disciplinas: List[str]
+    ids: array = field(default_factory=partial(array, "l"))
+    notas: array = field(default_factory=partial(array, "b"))
+
+    @classmethod
+    def de_turma(cls, turma: Turma) -> "TurmaCompacta":
+        compacta = cls(disciplinas=turma.disciplinas)
+        for aluno in turma.alunos:
+            compacta.adicionar_aluno(aluno)
+        return compacta
+
+    # todas as inserções passam por aqui, pelo que a matriz só tem notas 0..20
+    def adicionar(self, id: int, notas: List[int]) -> None:
+        if len(notas) != len(self.disciplinas):
+            raise ValueError(
+                f"Esperadas {len(self.disciplinas)} notas, lidas {len(notas)}"
+            )
+        validar_intervalo(notas)
+        self.ids.append(id)
+        self.notas.extend(notas)
+
+    def adicionar_aluno(self, aluno: Aluno) -> None:
+        em_falta = [d for d in self.disciplinas if aluno.nota(d) is None]
+        if em_falta:
+            raise ValueError(f"Aluno {aluno.id} sem nota em {', '.join(em_falta)}")
+        self.adicionar(aluno.id, [aluno.nota(d) for d in self.disciplinas])
+
+    def colunas(self) -> List[array]:
+        n = len(self.disciplinas)
+        return [self.notas[j::n] for j in range(n)]
+
+    def medias_por_disciplina(self) -> List[Tuple[str, float]]:
+        return [
+            (disciplina, sum(coluna) / len(coluna))
+            for disciplina, coluna in zip(self.disciplinas, self.colunas())
+        ]
+
+    def medias_dos_alunos(self) -> List[Tuple[int, float]]:
+        n = len(self.disciplinas)
+        totais = reduce(partial(map, add), self.colunas())
+        return [(id, total / n) for id, total in zip(self.ids, totais)]
+
+    def melhor_nota_por_disciplina(self) -> List[Tuple[str, int, int]]:
+        return [
+            (disciplina, self.ids[coluna.index(nota)], nota)
+            for disciplina, coluna in zip(self.disciplinas, self.colunas())
+            for nota in (max(coluna),)
+        ]
+
+    def pior_nota_por_disciplina(self) -> List[Tuple[str, int, int]]:
+        return [
+            (disciplina, self.ids[coluna.index(nota)], nota)
+            for disciplina, coluna in zip(self.disciplinas, self.colunas())
+            for nota in (min(coluna),)
+        ]
+
+
 def ler_aluno(id: int, disciplinas: List[str]) -> Aluno:
     notas = {}
     print(f"Avaliação do Aluno {id}:")
@@ -77,6 +152,194 @@ def ler_alunos(n: int, disciplinas: List[str]) -> Turma:
     return Turma(alunos=alunos, disciplinas=disciplinas)
 
 
+# Histograma de 21 posições para notas 0..20: memória constante, atualizável
+# nota a nota e fundível entre turmas
+@dataclass
+class HistogramaNotas:
+    contagens: List[int] = field(default_factory=lambda: [0] * (NOTA_MAXIMA + 1))
+
+    @classmethod
+    def de_notas(cls, notas: Iterable[int]) -> "HistogramaNotas":
+        histograma = cls()
+        for nota, contagem in Counter(notas).items():
+            histograma.adicionar(nota, contagem)
+        return histograma
+
+    def adicionar(self, nota: int, vezes: int = 1) -> None:
+        validar_intervalo([nota])
+        self.contagens[nota] += vezes
+
+    def fundir(self, outro: "HistogramaNotas") -> None:
+        self.contagens = list(map(add, self.contagens, outro.contagens))
+
+    def total(self) -> int:
+        return sum(self.contagens)
+
+    # total para as estatísticas, que não estão definidas sem notas
+    def total_nao_vazio(self) -> int:
+        n = self.total()
+        if n == 0:
+            raise StatisticsError("Histograma sem notas")
+        return n
+
+    def media(self) -> float:
+        n = self.total_nao_vazio()
+        return sum(map(mul, range(NOTA_MAXIMA + 1), self.contagens)) / n
+
+    # k-ésima nota (a partir de 0) na ordem crescente
+    def nota_de_ordem(self, k: int) -> int:
+        if not 0 <= k < self.total_nao_vazio():
+            raise ValueError(f"Ordem {k} fora do histograma")
+        return next(
+            nota
+            for nota, acumulado in enumerate(accumulate(self.contagens))
+            if acumulado > k
+        )
+
+    def mediana(self) -> float:
+        n = self.total_nao_vazio()
+        if n % 2 == 1:
+            return self.nota_de_ordem(n // 2)
+        return (self.nota_de_ordem(n // 2 - 1) + self.nota_de_ordem(n // 2)) / 2
+
+    # moda: em caso de empate, a nota mais baixa
+    def moda(self) -> int:
+        self.total_nao_vazio()
+        return self.contagens.index(max(self.contagens))
+
+    # percentil pelo método do rank mais próximo, 0 < p <= 100
+    def percentil(self, p: float) -> int:
+        if not 0 < p <= 100:
+            raise ValueError(f"Percentil {p} não está em ]0, 100]")
+        n = self.total_nao_vazio()
+        # aritmética exata: p / 100 * n em float arredonda mal ranks como 55% de 100
+        rank = ceil(Fraction(str(p)) * n / 100)
+        return self.nota_de_ordem(max(rank, 1) - 1)
+
+    def taxa_aprovacao(self) -> float:
+        return sum(self.contagens[NOTA_APROVACAO:]) / self.total_nao_vazio()
+
+    def distribuicao(self) -> List[Tuple[int, int]]:
+        return list(enumerate(self.contagens))
+
+
+@dataclass
+class EstatisticasTurma:
+    disciplinas: List[str]
+    histogramas: Dict[str, HistogramaNotas] = None
+
+    def __post_init__(self):
+        if self.histogramas is None:
+            self.histogramas = {d: HistogramaNotas() for d in self.disciplinas}
+
+    @classmethod
+    def de_turma(cls, turma: "Turma | TurmaCompacta") -> "EstatisticasTurma":
+        if isinstance(turma, TurmaCompacta):
+            colunas = turma.colunas()
+        else:
+            colunas = [turma.notas_de(d) for d in turma.disciplinas]
+        return cls(
+            disciplinas=turma.disciplinas,
+            histogramas={
+                d: HistogramaNotas.de_notas(coluna)
+                for d, coluna in zip(turma.disciplinas, colunas)
+            },
+        )
+
+    def adicionar_aluno(self, aluno: Aluno) -> None:
+        for disciplina in self.disciplinas:
+            self.histogramas[disciplina].adicionar(aluno.nota(disciplina))
+
+    def fundir(self, outra: "EstatisticasTurma") -> None:
+        for disciplina in self.disciplinas:
+            self.histogramas[disciplina].fundir(outra.histogramas[disciplina])
+
+
+def estatisticas_escola(
+    turmas: Iterable["Turma | TurmaCompacta"], disciplinas: List[str] = DISCIPLINAS
+) -> EstatisticasTurma:
+    escola = EstatisticasTurma(disciplinas=disciplinas)
+    for turma in turmas:
+        escola.fundir(EstatisticasTurma.de_turma(turma))
+    return escola
+
+
+@dataclass
+class ErroImportacao:
+    linha: int
+    mensagem: str
+
+
+def validar_notas(campos: List[str], disciplinas: List[str]) -> List[int]:
+    if len(campos) != len(disciplinas):
+        raise ValueError(f"Esperadas {len(disciplinas)} notas, lidas {len(campos)}")
+    notas = [int(campo) for campo in campos]
+    validar_intervalo(notas)
+    return notas
+
+
+def importar_lote(
+    turma: TurmaCompacta,
+    lote: List[List[str]],
+    numeros_linha: List[int],
+    primeiro_id: int,
+    erros: List[ErroImportacao],
+) -> None:
+    # caminho rápido: o lote inteiro é convertido e validado de uma vez
+    try:
+        if set(map(len, lote)) == {len(turma.disciplinas)}:
+            notas = array("b", map(int, chain.from_iterable(lote)))
+            if 0 <= min(notas) and max(notas) <= NOTA_MAXIMA:
+                turma.ids.extend(range(primeiro_id, primeiro_id + len(lote)))
+                turma.notas.extend(notas)
+                return
+    except (ValueError, OverflowError):
+        pass
+    # lote com erros: validação linha a linha para os isolar
+    for id, (campos, linha) in enumerate(zip(lote, numeros_linha), primeiro_id):
+        try:
+            turma.adicionar(id, validar_notas(campos, turma.disciplinas))
+        except ValueError as error:
+            erros.append(ErroImportacao(linha, str(error)))
+
+
+def importar_alunos(
+    ficheiro: TextIO, disciplinas: List[str], tamanho_lote: int = 8192
+) -> Tuple[TurmaCompacta, List[ErroImportacao]]:
+    turma = TurmaCompacta(disciplinas=disciplinas)
+    erros = []
+    leitor = csv.reader(ficheiro)
+
+    lote = []
+    numeros_linha = []
+    proximo_id = 1
+    primeira = True
+    for campos in leitor:
+        # linhas em branco são ignoradas e não consomem ids
+        if not campos:
+            continue
+        if primeira:
+            primeira = False
+            if [c.strip() for c in campos] == disciplinas:
+                continue
+        lote.append(campos)
+        numeros_linha.append(leitor.line_num)
+        if len(lote) == tamanho_lote:
+            importar_lote(turma, lote, numeros_linha, proximo_id, erros)
+            proximo_id += len(lote)
+            lote = []
+            numeros_linha = []
+    if lote:
+        importar_lote(turma, lote, numeros_linha, proximo_id, erros)
+
+    return turma, erros
+
+
+def imprime_erros_importacao(erros: List[ErroImportacao]) -> None:
+    for erro in erros:
+        print(f"[IMPORTAR_ALUNOS]: Linha {erro.linha}: {erro.mensagem}")
+
+
 def imprime_medias_por_disciplina(turma: Turma) -> None:
     print("Resultados: ")
     for disciplina, media in turma.medias_por_disciplina():
@@ -101,7 +364,42 @@ def imprime_pior_notas_por_disciplina(turma: Turma) -> None:
         print(f"- {disciplina}: Aluno {id} ({nota})")
 
 
-def main():
+def importar_turma(caminho: str) -> TurmaCompacta:
+    if caminho == "-":
+        turma, erros = importar_alunos(sys.stdin, DISCIPLINAS)
+    else:
+        try:
+            with open(caminho, encoding="utf-8", newline="") as ficheiro:
+                turma, erros = importar_alunos(ficheiro, DISCIPLINAS)
+        except OSError as error:
+            print("[IMPORTAR_ALUNOS]: ", error)
+            sys.exit(1)
+    imprime_erros_importacao(erros)
+    if len(turma.ids) == 0:
+        print("[IMPORTAR_ALUNOS]: Nenhum aluno válido")
+        sys.exit(1)
+    return turma
+
+
+def imprime_estatisticas_histograma(estatisticas: EstatisticasTurma) -> None:
+    print("Estatísticas por disciplina: ")
+    for disciplina, histograma in estatisticas.histogramas.items():
+        print(f"- {disciplina}:")
+        print(f"  Média: {histograma.media():.2f}")
+        print(f"  Mediana: {histograma.mediana():g}")
+        print(f"  Moda: {histograma.moda()}")
+        print(
+            "  Percentis: "
+            + ", ".join(f"P{p}: {histograma.percentil(p)}" for p in (10, 25, 75, 90))
+        )
+        print(f"  Taxa de aprovação: {histograma.taxa_aprovacao():.0%}")
+        print(
+            "  Distribuição: "
+            + " ".join(f"{nota}:{n}" for nota, n in histograma.distribuicao() if n)
+        )
+
+
+def ler_turma() -> Turma:
     n = 0
     print("Bem-vindo ao Sistema de Registo de Avaliação de Alunos\n")
 
@@ -113,7 +411,14 @@ def main():
         print("[NUMERO_DE_ALUNOS_INVALIDO]: ", error)
         sys.exit(1)
 
-    turma = ler_alunos(n, DISCIPLINAS)
+    return ler_alunos(n, DISCIPLINAS)
+
+
+# Uso: python turma.py [ficheiro.csv | -]
+# Sem argumentos as notas são pedidas interativamente; com um ficheiro (ou -
+# para stdin) cada linha tem as notas de um aluno, uma coluna por disciplina.
+def main():
+    turma = importar_turma(sys.argv[1]) if len(sys.argv) > 1 else ler_turma()
     print("")
     imprime_medias_por_disciplina(turma)
     print("")
@@ -122,6 +427,8 @@ def main():
     imprime_melhor_notas_por_disciplina(turma)
     print("")
     imprime_pior_notas_por_disciplina(turma)
+    print("")
+    imprime_estatisticas_histograma(EstatisticasTurma.de_turma(turma))
 
 
 if __name__ == "__main__":
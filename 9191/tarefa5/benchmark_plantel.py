@@ -0,0 +1,65 @@
+"""benchmark_plantel.py: Escalabilidade das estatísticas do plantel por processos
+
+Uso: python benchmark_plantel.py [número de medidas] [semente]
+"""
+
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+from gestor_plantel import Jogador, Medida, Metrica, Plantel
+
+
+def gerar_plantel(n_medidas: int, semente: int = 0, n_jogadores: int = 1000) -> Plantel:
+    """Gera um plantel sintético com n_medidas medidas"""
+    aleatorio = Random(semente)
+    jogadores = [Jogador(i, f"Jogador {i}") for i in range(1, n_jogadores + 1)]
+    metricas = list(Metrica)
+    medidas = [
+        Medida(
+            metricas[i % len(metricas)],
+            aleatorio.randint(0, 90),
+            i // (len(metricas) * n_jogadores) + 1,
+            aleatorio.randint(1, n_jogadores),
+        )
+        for i in range(n_medidas)
+    ]
+    return Plantel(jogadores, medidas)
+
+
+def cronometrar(f, *args):
+    """Retorna o resultado e o tempo, em segundos, de f(*args)"""
+    inicio = perf_counter()
+    resultado = f(*args)
+    return resultado, perf_counter() - inicio
+
+
+def main():
+    """Função de entrada"""
+    n_medidas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    plantel = gerar_plantel(n_medidas, semente)
+    referencia, tempo_serie = cronometrar(plantel.estatisticas_plantel)
+    print(f"Medidas: {n_medidas}")
+    print(f"Referência (estatisticas_plantel, em série): {tempo_serie:.3f} s")
+    # o speedup é relativo ao modo paralelo com 1 processo, que faz uma só
+    # passagem, para isolar o efeito do número de núcleos
+    print(f"{'processos':>9} {'tempo (s)':>10} {'speedup':>8}")
+
+    tempo_um = None
+    processos = 1
+    while processos <= (os.cpu_count() or 1):
+        estatisticas, tempo = cronometrar(
+            plantel.estatisticas_plantel_paralelo, processos
+        )
+        if estatisticas != referencia:
+            raise RuntimeError(f"Resultados divergem com {processos} processos")
+        tempo_um = tempo_um or tempo
+        print(f"{processos:>9} {tempo:>10.3f} {tempo_um / tempo:>8.2f}")
+        processos *= 2
+
+
+if __name__ == "__main__":
+    main()
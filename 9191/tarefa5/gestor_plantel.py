@@ -1,12 +1,17 @@
 """gestor_plantel.py: Sistema de Gestão do plantel
 """
 
+import os
 import sys
-from dataclasses import dataclass, astuple
+from dataclasses import dataclass, field, astuple
 from enum import StrEnum
-from statistics import mean
-from typing import List, Any, Dict, Tuple, Callable, Iterator
-from operator import attrgetter
+from itertools import accumulate
+from math import ceil
+from multiprocessing import get_all_start_methods, get_context
+from random import Random
+from statistics import mean, StatisticsError
+from typing import List, Any, Dict, Tuple, Callable, Iterable, Iterator
+from operator import attrgetter, itemgetter
 
 
 class Metrica(StrEnum):
@@ -45,6 +50,88 @@ class Medida:
     jogador_id: int
 
 
+QUANTIS: Tuple[float, ...] = (0.1, 0.5, 0.9)
+
+
+class EsbocoQuantis:
+    """Esboço de quantis em streaming (KLL) com memória limitada e fundível
+
+    Mantém uma pilha de compactadores; o compactador de altura h guarda
+    valores com peso 2**h. Quando o esboço enche, um compactador é ordenado
+    e metade dos seus valores (pares ou ímpares, ao acaso) sobe de nível.
+    A memória é O(k) e o erro de rank normalizado é O(1/k): com k=200 o
+    rank devolvido fica tipicamente a menos de 1% do rank exato.
+    """
+
+    def __init__(self, k: int = 200, semente: int = None):
+        self.k = k
+        self.aleatorio = Random(semente)
+        self.compactores: List[List[int]] = []
+        self.n = 0
+        self.tamanho = 0
+        self.tamanho_max = 0
+        self._crescer()
+
+    def _capacidade(self, altura: int) -> int:
+        profundidade = len(self.compactores) - altura - 1
+        return int(ceil(self.k * (2 / 3) ** profundidade)) + 1
+
+    def _crescer(self):
+        self.compactores.append([])
+        self.tamanho_max = sum(map(self._capacidade, range(len(self.compactores))))
+
+    def _compactar(self):
+        for altura, compactor in enumerate(self.compactores):
+            if len(compactor) >= self._capacidade(altura):
+                if altura + 1 >= len(self.compactores):
+                    self._crescer()
+                compactor.sort()
+                # se ímpar, o maior valor fica no nível atual
+                resto = [compactor.pop()] if len(compactor) % 2 else []
+                inicio = self.aleatorio.getrandbits(1)
+                self.compactores[altura + 1].extend(compactor[inicio::2])
+                self.compactores[altura] = resto
+                self.tamanho = sum(map(len, self.compactores))
+                if self.tamanho < self.tamanho_max:
+                    break
+
+    def adicionar(self, valor: int):
+        """Adiciona um valor ao esboço"""
+        self.compactores[0].append(valor)
+        self.n += 1
+        self.tamanho += 1
+        if self.tamanho >= self.tamanho_max:
+            self._compactar()
+
+    def fundir(self, outro: "EsbocoQuantis"):
+        """Funde outro esboço neste"""
+        while len(self.compactores) < len(outro.compactores):
+            self._crescer()
+        for altura, compactor in enumerate(outro.compactores):
+            self.compactores[altura].extend(compactor)
+        self.n += outro.n
+        self.tamanho = sum(map(len, self.compactores))
+        while self.tamanho >= self.tamanho_max:
+            self._compactar()
+
+    def quantil(self, q: float) -> int:
+        """Retorna uma estimativa do quantil q (0 <= q <= 1)"""
+        if self.n == 0:
+            raise ValueError("Esboço vazio")
+        pesados = sorted(
+            (valor, 1 << altura)
+            for altura, compactor in enumerate(self.compactores)
+            for valor in compactor
+        )
+        alvo = q * self.n
+        for (valor, _), acumulado in zip(
+            pesados, accumulate(map(itemgetter(1), pesados))
+        ):
+            if acumulado >= alvo:
+                return valor
+        return pesados[-1][0]
+
+
 @dataclass
 class EstatisticaPlantel:
     """Representação para Estatísticas do Plantel"""
@@ -53,6 +140,70 @@ class EstatisticaPlantel:
     media: float
     melhor: Tuple[int, str]
     pior: Tuple[int, str]
+    quantis: Dict[float, int] = field(default_factory=dict)
+
+
+@dataclass
+class AgregadoParcial:
+    """Agregado parcial de uma metrica, fundível entre fatias de medidas"""
+
+    contagem: int = 0
+    soma: int = 0
+    maximo: Tuple[int, int] = None
+    minimo: Tuple[int, int] = None
+
+    def adicionar(self, medida: Medida):
+        """Acumula uma medida; máximo e mínimo são tuplos (valor, jogador_id)"""
+        self.contagem += 1
+        self.soma += medida.valor
+        if self.maximo is None or medida.valor > self.maximo[0]:
+            self.maximo = (medida.valor, medida.jogador_id)
+        if self.minimo is None or medida.valor < self.minimo[0]:
+            self.minimo = (medida.valor, medida.jogador_id)
+
+    def fundir(self, outro: "AgregadoParcial"):
+        """Funde o agregado de uma fatia posterior, mantendo o primeiro em empates"""
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        if outro.maximo is not None and (
+            self.maximo is None or outro.maximo[0] > self.maximo[0]
+        ):
+            self.maximo = outro.maximo
+        if outro.minimo is not None and (
+            self.minimo is None or outro.minimo[0] < self.minimo[0]
+        ):
+            self.minimo = outro.minimo
+
+    def media(self) -> float:
+        """Retorna a média das medidas acumuladas"""
+        if self.contagem == 0:
+            raise StatisticsError("mean requires at least one data point")
+        return self.soma / self.contagem
+
+
+def agregar_medidas(medidas: Iterable[Medida]) -> Dict[Metrica, AgregadoParcial]:
+    """Retorna os agregados parciais, por metrica, de um conjunto de medidas"""
+    agregados = {metrica: AgregadoParcial() for metrica in Metrica}
+    for medida in medidas:
+        agregados[medida.metrica].adicionar(medida)
+    return agregados
+
+
+# Estado de cada processo do pool, só usado com fork: as medidas são herdadas
+# do processo pai sem serialização e cada tarefa recebe apenas os limites da
+# sua fatia. Sem fork (spawn/forkserver) cada tarefa recebe a própria fatia,
+# pelo que cada medida é serializada uma única vez.
+_MEDIDAS_DO_PROCESSO: List[Medida] = []
+
+
+def _iniciar_processo(medidas: List[Medida]):
+    global _MEDIDAS_DO_PROCESSO
+    _MEDIDAS_DO_PROCESSO = medidas
+
+
+def _agregar_fatia(limites: Tuple[int, int]) -> Dict[Metrica, AgregadoParcial]:
+    inicio, fim = limites
+    return agregar_medidas(_MEDIDAS_DO_PROCESSO[inicio:fim])
 
 
 @dataclass
@@ -61,6 +212,16 @@ class Plantel:
 
     jogadores: List[Jogador]
     medidas: List[Medida]
+    esbocos: Dict[Metrica, EsbocoQuantis] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        for metrica in Metrica:
+            if metrica not in self.esbocos:
+                self.esbocos[metrica] = EsbocoQuantis()
+        for medida in self.medidas:
+            self.esbocos[medida.metrica].adicionar(medida.valor)
 
     def adicionar_jogador(self, jogador: Jogador):
         """Adiciona um Jogador"""
@@ -69,6 +230,11 @@ class Plantel:
     def adicionar_medida(self, medida: Medida):
         """Adiciona uma medida"""
         self.medidas.append(medida)
+        self.esbocos[medida.metrica].adicionar(medida.valor)
+
+    def esboco_de_metrica(self, metrica: Metrica) -> EsbocoQuantis:
+        """Retorna o esboço de quantis de uma dada metrica"""
+        return self.esbocos[metrica]
 
     def jogador_por_id(self, jogador_id: int) -> Jogador:
         """Retorna o jogador com um dado id"""
@@ -106,6 +272,62 @@ class Plantel:
                 media=mean(medida.valor for medida in self.medidas_de_metrica(metrica)),
                 melhor=obter_tuplo_valor_nome(self.max_de_metrica(metrica)),
                 pior=obter_tuplo_valor_nome(self.min_de_metrica(metrica)),
+                quantis={
+                    q: self.esboco_de_metrica(metrica).quantil(q) for q in QUANTIS
+                },
+            )
+            for metrica in Metrica
+        ]
+
+    def estatisticas_plantel_paralelo(
+        self, processos: int = None, fatias_por_processo: int = 4
+    ) -> List[EstatisticaPlantel]:
+        """Retorna as estatísticas do plantel calculadas por um pool de processos
+
+        As medidas são divididas em fatias contíguas, cada fatia é agregada
+        num processo e os agregados são fundidos pela ordem das fatias, pelo
+        que o resultado coincide com estatisticas_plantel.
+        """
+        processos = processos or os.cpu_count() or 1
+        total = len(self.medidas)
+        tamanho = max(1, ceil(total / (processos * fatias_por_processo)))
+        limites = [
+            (inicio, min(inicio + tamanho, total))
+            for inicio in range(0, total, tamanho)
+        ]
+
+        if "fork" in get_all_start_methods():
+            with get_context("fork").Pool(
+                processos, initializer=_iniciar_processo, initargs=(self.medidas,)
+            ) as pool:
+                parciais = pool.map(_agregar_fatia, limites)
+        else:
+            with get_context().Pool(processos) as pool:
+                parciais = pool.map(
+                    agregar_medidas,
+                    (self.medidas[inicio:fim] for inicio, fim in limites),
+                )
+
+        agregados = {metrica: AgregadoParcial() for metrica in Metrica}
+        for parcial in parciais:
+            for metrica, agregado in parcial.items():
+                agregados[metrica].fundir(agregado)
+
+        nomes = {jogador.id: jogador.nome for jogador in self.jogadores}
+
+        def obter_tuplo_valor_nome(valor_e_id: Tuple[int, int]):
+            valor, jogador_id = valor_e_id
+            return (valor, nomes[jogador_id])
+
+        return [
+            EstatisticaPlantel(
+                metrica=metrica,
+                media=agregados[metrica].media(),
+                melhor=obter_tuplo_valor_nome(agregados[metrica].maximo),
+                pior=obter_tuplo_valor_nome(agregados[metrica].minimo),
+                quantis={
+                    q: self.esboco_de_metrica(metrica).quantil(q) for q in QUANTIS
+                },
             )
             for metrica in Metrica
         ]
@@ -203,19 +425,23 @@ def adicionar_jogadores_plantel(plantel: Plantel = None) -> Plantel:
 
 def imprimir_estatisticas(estatisticas: List[EstatisticaPlantel]):
     """Imprime estatísticas"""
-    for metrica, media, (melhor_valor, melhor_nome), (pior_valor, pior_nome) in map(
-        astuple, estatisticas
-    ):
+    for metrica, media, melhor, pior, quantis in map(astuple, estatisticas):
+        melhor_valor, melhor_nome = melhor
+        pior_valor, pior_nome = pior
         print(f"\nEstatísticas para {metrica}:")
         print(f"Média: {media: .2f}")
         print(f"Máximo: {melhor_valor} (melhor desempenho: {melhor_nome})")
         print(f"Mínimo: {pior_valor} (pior desempenho: {pior_nome})")
+        print(
+            "Quantis: "
+            + ", ".join(f"P{q * 100:g}: {valor}" for q, valor in quantis.items())
+        )
 
 
 def imprimir_recomendacoes(estatisticas: List[EstatisticaPlantel]):
     """Imprime recomendações"""
     print("\nRecomendações:")
-    for metrica, _, (_, melhor_nome), (_, pior_nome) in map(astuple, estatisticas):
+    for metrica, _, (_, melhor_nome), (_, pior_nome), _ in map(astuple, estatisticas):
         recomendacao = RECOMENDACAO_METRICAS.get(metrica)
         print(recomendacao.melhor(melhor_nome))
         print(recomendacao.pior(pior_nome))
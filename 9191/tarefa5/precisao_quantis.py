@@ -0,0 +1,88 @@
+"""precisao_quantis.py: Precisão do EsbocoQuantis face aos quantis exatos
+
+Compara, em dados sintéticos, os quantis do esboço (inteiro e fundido a
+partir de várias partes) com os quantis exatos obtidos por ordenação, e
+falha se o erro de rank normalizado exceder o documentado (~1% com k=200).
+
+Uso: python precisao_quantis.py [número de valores] [semente]
+"""
+
+import sys
+from bisect import bisect_left, bisect_right
+from random import Random
+from typing import Callable, Dict, List
+
+from gestor_plantel import EsbocoQuantis
+
+ERRO_RANK_MAXIMO = 0.01
+QUANTIS_TESTADOS = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+PARTES_FUSAO = 8
+
+DISTRIBUICOES: Dict[str, Callable[[Random], int]] = {
+    "uniforme": lambda aleatorio: aleatorio.randint(0, 100_000),
+    "exponencial": lambda aleatorio: int(aleatorio.expovariate(1 / 1000)),
+    "normal": lambda aleatorio: int(aleatorio.gauss(5000, 1500)),
+    "minutos": lambda aleatorio: aleatorio.randint(0, 90),
+}
+
+
+def erro_rank(ordenados: List[int], valor: int, q: float) -> float:
+    """Distância normalizada entre q e o intervalo de ranks ocupado por valor"""
+    n = len(ordenados)
+    rank_min = bisect_left(ordenados, valor) / n
+    rank_max = bisect_right(ordenados, valor) / n
+    if rank_min <= q <= rank_max:
+        return 0.0
+    return min(abs(q - rank_min), abs(q - rank_max))
+
+
+def esboco_inteiro(valores: List[int], semente: int) -> EsbocoQuantis:
+    """Esboço alimentado com todos os valores"""
+    esboco = EsbocoQuantis(semente=semente)
+    for valor in valores:
+        esboco.adicionar(valor)
+    return esboco
+
+
+def esboco_fundido(valores: List[int], semente: int) -> EsbocoQuantis:
+    """Esboço obtido pela fusão de esboços de partes intercaladas"""
+    partes = [
+        esboco_inteiro(valores[i::PARTES_FUSAO], semente + i)
+        for i in range(PARTES_FUSAO)
+    ]
+    esboco = partes[0]
+    for parte in partes[1:]:
+        esboco.fundir(parte)
+    return esboco
+
+
+MODOS = {"inteiro": esboco_inteiro, "fundido": esboco_fundido}
+
+
+def main():
+    """Função de entrada"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    pior = 0.0
+    for nome, gerar in DISTRIBUICOES.items():
+        aleatorio = Random(semente)
+        valores = [gerar(aleatorio) for _ in range(n)]
+        ordenados = sorted(valores)
+        for modo, construir in MODOS.items():
+            esboco = construir(valores, semente)
+            if esboco.n != n:
+                raise AssertionError(f"{nome}/{modo}: esboço com {esboco.n} de {n}")
+            erros = [
+                erro_rank(ordenados, esboco.quantil(q), q) for q in QUANTIS_TESTADOS
+            ]
+            pior = max(pior, *erros)
+            print(f"{nome:>12} {modo:>8}: erro de rank máximo {max(erros):.4%}")
+
+    if pior > ERRO_RANK_MAXIMO:
+        raise AssertionError(f"Erro de rank {pior:.4%} acima de {ERRO_RANK_MAXIMO:.0%}")
+    print(f"OK: erro de rank máximo {pior:.4%} <= {ERRO_RANK_MAXIMO:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,24 @@
 """
 
 import csv
+import os
+import sys
 from dataclasses import dataclass, astuple
 from typing import List, Any, Dict, Callable, Iterator
 from operator import attrgetter
 
+# instrumentacao.py está na pasta acima, partilhada com as outras tarefas
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentacao import (  # noqa: E402
+    Instrumentacao,
+    contar_escritas,
+    contar_lidas,
+)
+
+instrumentacao = Instrumentacao("grupo_desportivo")
+instrumentar = instrumentacao.instrumentar
+entrada = instrumentacao.entrada
+
 
 @dataclass(frozen=True, order=True)
 class Avaliacao:
@@ -36,6 +50,7 @@ def ler_lista_tipo(filename: str) -> List[Any]:
         return []
 
 
+@instrumentar("ler_desportistas", contar_lidas)
 def ler_desportistas(filename: str = "desportistas.csv") -> List[Desportista]:
     """Lê desportistas de um ficheiro"""
     return [
@@ -44,6 +59,7 @@ def ler_desportistas(filename: str = "desportistas.csv") -> List[Desportista]:
     ]
 
 
+@instrumentar("ler_avaliacoes", contar_lidas)
 def ler_avaliacoes(filename: str = "avaliacoes.csv") -> List[Avaliacao]:
     """Lê avaliações de um ficheiro"""
     return [
@@ -64,6 +80,7 @@ def escrever_lista_tipo(
         writer.writerows(map(t, elementos))
 
 
+@instrumentar("escrever_desportistas", contar_escritas)
 def escrever_desportistas(
     elementos: List[Desportista], filename: str = "desportistas.csv"
 ):
@@ -71,6 +88,7 @@ def escrever_desportistas(
     return escrever_lista_tipo(filename, elementos, astuple, ("id", "nome"))
 
 
+@instrumentar("escrever_avaliacoes", contar_escritas)
 def escrever_avaliacoes(elementos: List[Avaliacao], filename: str = "avaliacoes.csv"):
     """Escreve um csv com avaliacões"""
     return escrever_lista_tipo(
@@ -117,6 +135,10 @@ class GrupoDesportivo:
             if avaliacao.desportista_id == desportista.id
         ]
 
+    @instrumentar(
+        "salvar",
+        lambda args, _: len(args[0].desportistas) + len(args[0].avaliacoes),
+    )
     def salvar(
         self,
         ficheiro_desportistas: str = "desportistas.csv",
@@ -149,7 +171,7 @@ def visualizar_desportistas(grupo: GrupoDesportivo):
 
 def adicionar_desportista(grupo: GrupoDesportivo):
     """Comando para adicionar um desportista do grupo"""
-    nome = input("Insira o nome do desportista: ").strip()
+    nome = entrada("Insira o nome do desportista: ").strip()
     try:
         desportista = grupo.adicionar_desportista(nome)
         print(f"Criado Desportista {desportista.id}: {desportista.nome}")
@@ -159,18 +181,23 @@ def adicionar_desportista(grupo: GrupoDesportivo):
 
 def adicionar_avaliacao(grupo: GrupoDesportivo):
     """Comando para adicionar uma avaliação do grupo"""
-    nome = input("Insira o nome do desportista: ").strip()
+    nome = entrada("Insira o nome do desportista: ").strip()
     desportista = grupo.desportista_chamado(nome)
     if desportista is None:
         print("Desportista não existe")
     else:
         try:
-            valor = float(input("Valor: "))
+            valor = float(entrada("Valor: "))
             grupo.adicionar_avaliacao(desportista.id, valor)
         except ValueError as error:
             print(error)
 
 
+def mostrar_estatisticas(_):
+    """Comando para mostrar chamadas e latências de comandos e I/O"""
+    instrumentacao.imprimir()
+
+
 def listar_commandos(_):
     """Comando para listar os comandos"""
     print("Lista de comandos:")
@@ -182,13 +209,18 @@ COMANDOS: Dict[str, Callable] = {
     "adicionar_desportista": adicionar_desportista,
     "adicionar_avaliacao": adicionar_avaliacao,
     "visualizar": visualizar_desportistas,
+    "estatisticas": mostrar_estatisticas,
     "ajuda": listar_commandos,
     "sair": None,
 }
 
+COMANDOS.update(
+    {cmd: instrumentar(cmd)(f) for cmd, f in COMANDOS.items() if f is not None}
+)
 
-def main():
-    """Função de entrada"""
+
+def sessao():
+    """Ciclo de comandos, entre a leitura e a gravação do grupo"""
     parar = False
     desportistas = ler_desportistas()
     avaliacoes = ler_avaliacoes()
@@ -210,5 +242,13 @@ def main():
     grupo.salvar()
 
 
+def main():
+    """Função de entrada
+
+    Com --perfil a sessão corre sob cProfile e é gravado um dump pstats.
+    """
+    instrumentacao.executar_sessao(sessao)
+
+
 if __name__ == "__main__":
     main()
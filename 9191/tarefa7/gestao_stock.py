@@ -2,11 +2,25 @@
 """
 
 import csv
+import os
+import sys
 from dataclasses import dataclass, astuple
 from typing import List, Any, Dict, Callable, Iterator
 from operator import attrgetter
 from statistics import mean
 
+# instrumentacao.py está na pasta acima, partilhada com as outras tarefas
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentacao import (  # noqa: E402
+    Instrumentacao,
+    contar_escritas,
+    contar_lidas,
+)
+
+instrumentacao = Instrumentacao("gestao_stock")
+instrumentar = instrumentacao.instrumentar
+entrada = instrumentacao.entrada
+
 
 @dataclass(frozen=True, order=True)
 class Preco:
@@ -37,6 +51,7 @@ def ler_lista_tipo(filename: str) -> List[Any]:
         return []
 
 
+@instrumentar("ler_produtos", contar_lidas)
 def ler_produtos(filename: str = "produtos.csv") -> List[Produto]:
     """Lê produtos de um ficheiro"""
     return [
@@ -44,6 +59,7 @@ def ler_produtos(filename: str = "produtos.csv") -> List[Produto]:
     ]
 
 
+@instrumentar("ler_precos", contar_lidas)
 def ler_precos(filename: str = "precos.csv") -> List[Preco]:
     """Lê preços de um ficheiro"""
     return [
@@ -64,11 +80,13 @@ def escrever_lista_tipo(
         writer.writerows(map(t, elementos))
 
 
+@instrumentar("escrever_produtos", contar_escritas)
 def escrever_produtos(elementos: List[Produto], filename: str = "produtos.csv"):
     """Escreve um csv com produtos"""
     return escrever_lista_tipo(filename, elementos, astuple, ("id", "nome"))
 
 
+@instrumentar("escrever_precos", contar_escritas)
 def escrever_precos(elementos: List[Preco], filename: str = "precos.csv"):
     """Escreve um csv com avaliacões"""
     return escrever_lista_tipo(
@@ -109,6 +127,9 @@ class GestorStock:
         """Retorna um iterador para preços de um produto"""
         return [preco for preco in self.precos if preco.produto_id == produto.id]
 
+    @instrumentar(
+        "salvar", lambda args, _: len(args[0].produtos) + len(args[0].precos)
+    )
     def salvar(
         self,
         ficheiro_produtos: str = "produtos.csv",
@@ -141,7 +162,7 @@ def ver_produtos(gestor: GestorStock):
 
 def adicionar_produto(gestor: GestorStock):
     """Comando para adicionar um produto do gestor"""
-    nome = input("Insira o nome do produto: ").strip().lower()
+    nome = entrada("Insira o nome do produto: ").strip().lower()
     try:
         produto = gestor.adicionar_produto(nome)
         print(f"Criado Produto {produto.id}: {produto.nome}")
@@ -151,13 +172,13 @@ def adicionar_produto(gestor: GestorStock):
 
 def adicionar_preco(gestor: GestorStock):
     """Comando para adicionar uma preço do gestor"""
-    nome = input("Insira o nome do produto: ").strip()
+    nome = entrada("Insira o nome do produto: ").strip()
     produto = gestor.produto_chamado(nome)
     if produto is None:
         print("Produto não existe")
     else:
         try:
-            valor = float(input("Preço: "))
+            valor = float(entrada("Preço: "))
             if valor < 0:
                 raise ValueError("Preço não pode ser negativo")
             gestor.adicionar_preco(produto.id, valor)
@@ -167,7 +188,7 @@ def adicionar_preco(gestor: GestorStock):
 
 def media_de_produto(gestor: GestorStock):
     """Comando para calcular média de preços de um produto"""
-    nome = input("Nome de produto: ")
+    nome = entrada("Nome de produto: ")
     produto = gestor.produto_chamado(nome)
     if produto is None:
         print("Produto inexistente!")
@@ -177,6 +198,11 @@ def media_de_produto(gestor: GestorStock):
         print(f"Média de preços de {nome}: {media: .2f}")
 
 
+def mostrar_estatisticas(_):
+    """Comando para mostrar chamadas e latências de comandos e I/O"""
+    instrumentacao.imprimir()
+
+
 def listar_commandos(_):
     """Comando para listar os comandos"""
     print("Lista de comandos:")
@@ -189,13 +215,18 @@ COMANDOS: Dict[str, Callable] = {
     "adicionar preço a um produto": adicionar_preco,
     "ver produtos": ver_produtos,
     "calcular média de preços de um produto": media_de_produto,
+    "estatisticas": mostrar_estatisticas,
     "ajuda": listar_commandos,
     "sair": None,
 }
 
+COMANDOS.update(
+    {cmd: instrumentar(cmd)(f) for cmd, f in COMANDOS.items() if f is not None}
+)
 
-def main():
-    """Função de entrada"""
+
+def sessao():
+    """Ciclo de comandos, entre a leitura e a gravação do stock"""
     parar = False
     produtos = ler_produtos()
     precos = ler_precos()
@@ -217,5 +248,13 @@ def main():
     gestor.salvar()
 
 
+def main():
+    """Função de entrada
+
+    Com --perfil a sessão corre sob cProfile e é gravado um dump pstats.
+    """
+    instrumentacao.executar_sessao(sessao)
+
+
 if __name__ == "__main__":
     main()